@@ -27,14 +27,39 @@ import os
 import re
 import argparse
 import html
-import time
-import random
 import requests
 import json
-import xml.etree.ElementTree as ET
+import copy
+import random
+import time
+import hashlib
+import sqlite3
+import atexit
+import functools
+# lxml (parser/serializador en C) si está instalado; la API usada es compatible con xml.etree
+try:
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+_LXML = ET.__name__.startswith("lxml")
+# Con lxml se conservan las secciones CDATA (<![CDATA[<b>..</b>]]>) de los recursos que no se tocan al escribir.
+# Las entidades externas (<!ENTITY x SYSTEM "file:...">) nunca se resuelven ni se accede a la red, como con
+# xml.etree: lxml < 5 las resuelve por defecto. "internal" (expandir solo las declaradas en el DOCTYPE) existe
+# desde lxml 5; antes solo se puede desactivar todo.
+_LXML_PARSE_OPTIONS = {
+    "strip_cdata": False,
+    "resolve_entities": "internal" if ET.LXML_VERSION >= (5,) else False,
+    "no_network": True,
+} if _LXML else {}
+# orjson (JSON en C) si está instalado para el cuerpo/respuesta de /translate; si no, json de la stdlib
+try:
+    import orjson
+except ImportError:
+    orjson = None
 from urllib.parse import quote
 import threading
 import concurrent.futures
+from collections import OrderedDict, namedtuple
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
@@ -58,34 +83,429 @@ MS_TRANSLATOR_CONFIG = {
     "text_type": "plain",
 }
 
+# Instantánea inmutable de MS_TRANSLATOR_CONFIG con URL, cabeceras y parámetros fijos ya calculados,
+# para no reconstruirlos en cada petición. Se genera con freeze_config() tras configurar el dict.
+MSConfig = namedtuple("MSConfig", "key url headers params cache_scope")
+_MS_CFG = None
+
+def freeze_config():
+    """Congela MS_TRANSLATOR_CONFIG en un MSConfig usado por todas las peticiones siguientes.
+    Llamar de nuevo si se modifica MS_TRANSLATOR_CONFIG después.
+    """
+    global _MS_CFG
+    endpoint = MS_TRANSLATOR_CONFIG.get("endpoint") or "https://api.cognitive.microsofttranslator.com"
+    key = MS_TRANSLATOR_CONFIG.get("key")
+    region = MS_TRANSLATOR_CONFIG.get("region")
+    category = MS_TRANSLATOR_CONFIG.get("category")
+
+    headers = {
+        "Ocp-Apim-Subscription-Key": key,
+        "Content-Type": "application/json",
+        "Accept": "application/json",
+        "Connection": "keep-alive",
+    }
+    if region:
+        headers["Ocp-Apim-Subscription-Region"] = region
+
+    params = {
+        "api-version": MS_TRANSLATOR_CONFIG.get("api_version", "3.0"),
+        "textType": MS_TRANSLATOR_CONFIG.get("text_type", "plain"),
+    }
+    if category:
+        params["category"] = category
+
+    url = endpoint.rstrip('/') + "/translate"
+    # Lo que cambia el resultado del servicio (además del texto e idiomas) entra en la clave de la caché en disco
+    cache_scope = f"{url}|{params['api-version']}|{params['textType']}|{category or ''}"
+    _MS_CFG = MSConfig(key, url, headers, params, cache_scope)
+    _request_params.cache_clear()
+    # La LRU en memoria no guarda esa parte de la clave: con otra configuración se descarta
+    with _translation_cache_lock:
+        _TRANSLATION_CACHE.clear()
+    return _MS_CFG
+
+@functools.lru_cache(maxsize=128)
+def _request_params(source_lang, target_langs, transliterate):
+    """Parámetros de consulta de /translate para (origen, idiomas destino, transliterar), como tupla de pares.
+    Son los mismos para todos los batches de un mismo trabajo; freeze_config() vacía esta caché.
+    """
+    params = list((_MS_CFG or freeze_config()).params.items())
+    params.extend(("to", lang) for lang in target_langs)
+    # Permitir auto-detección si source_lang == 'auto'
+    if source_lang and str(source_lang).lower() != 'auto':
+        params.append(("from", source_lang))
+    if transliterate:
+        params.append(("toScript", "Latn"))
+    return tuple(params)
+
 # Config HTTP global (se establece en main)
 HTTP_CONFIG = {
     "timeout": float(os.getenv("AZURE_TRANSLATOR_HTTP_TIMEOUT", "30")),
     "pool_maxsize": int(os.getenv("AZURE_TRANSLATOR_HTTP_POOL_MAXSIZE", "50")),
     "retries": int(os.getenv("AZURE_TRANSLATOR_HTTP_RETRIES", "3")),
+    "concurrency": int(os.getenv("AZURE_TRANSLATOR_HTTP_CONCURRENCY", "8")),
+    # Segmentos por petición /translate (--ms-batch-size); se acota a MAX_BATCH_ITEMS
+    "batch_size": int(os.getenv("AZURE_TRANSLATOR_BATCH_SIZE", "100")),
+    # Límite global de peticiones simultáneas (None = tamaño del pool); main() lo fija con --max-workers
+    "max_in_flight": None,
+    # Caracteres por minuto enviados al servicio (texto x idiomas destino); 0 = sin límite
+    "chars_per_minute": int(os.getenv("AZURE_TRANSLATOR_CHARS_PER_MINUTE", "0")),
 }
 
-# Sesión por hilo con pool de conexiones
-_thread_local = threading.local()
+# Máximo de elementos por petición /translate (límite de Azure Translator v3: 1000)
+MAX_BATCH_ITEMS = 1000
+# Presupuesto de caracteres por petición (el texto total de una petición tiene límite en el servicio)
+MAX_BATCH_CHARS = 9000
+# Límite de Azure por petición: caracteres del texto × idiomas destino (cada "to" cuenta el texto otra vez)
+MAX_REQUEST_CHARS = 50000
+
+# Hilos dedicados a escribir los XML traducidos (E/S de disco), independientes del límite HTTP (--max-workers)
+XML_WRITE_WORKERS = int(os.getenv("ANDROID_XML_WRITE_WORKERS", "4"))
+
+# Pausa compartida tras un 429: hasta este instante (time.monotonic) ninguna petición nueva sale,
+# así un solo aviso de throttling frena a todos los hilos en lugar de que cada uno reciba su propio 429
+_throttled_until = 0.0
+_throttle_lock = threading.Lock()
+
+def _throttle(seconds):
+    global _throttled_until
+    with _throttle_lock:
+        _throttled_until = max(_throttled_until, time.monotonic() + seconds)
+
+def _wait_if_throttled():
+    delay = _throttled_until - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+
+class _JitterRetry(Retry):
+    """Retry de urllib3 con jitter decorrelado entre intentos: espera = min(backoff_max, U(base, anterior*3)).
+    Si la respuesta trae Retry-After, urllib3 lo respeta (en lugar del backoff) y aquí se registra.
+    Un 429 pausa además las peticiones nuevas de todos los hilos durante esa misma espera.
+    """
+
+    def __init__(self, *args, prev_backoff=0.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prev_backoff = prev_backoff
+
+    def new(self, **kw):
+        kw.setdefault("prev_backoff", self.prev_backoff)
+        return super().new(**kw)
+
+    def _backoff_cap(self):
+        # backoff_max es atributo de instancia desde urllib3 2.x; en 1.26 el tope es de clase
+        cap = getattr(self, "backoff_max", None)
+        if cap is None:
+            cap = Retry.DEFAULT_BACKOFF_MAX if hasattr(Retry, "DEFAULT_BACKOFF_MAX") else Retry.BACKOFF_MAX
+        return cap
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        new_retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        base = self.backoff_factor
+        new_retry.prev_backoff = min(self._backoff_cap(), random.uniform(base, max(base, self.prev_backoff * 3)))
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            print(f"{YELLOW}HTTP {response.status}: Retry-After {retry_after}s{RESET}")
+        if response is not None and response.status == 429:
+            try:
+                pause = self.parse_retry_after(retry_after) if retry_after else new_retry.prev_backoff
+            except Exception:
+                pause = new_retry.prev_backoff
+            _throttle(min(pause, self._backoff_cap()))
+        return new_retry
+
+    def get_backoff_time(self):
+        return self.prev_backoff if self.history else 0
+
+# Sesión HTTP única compartida por todos los hilos: un solo pool de conexiones keep-alive,
+# de modo que el handshake TLS se hace una vez y no por hilo/idioma.
+_SESSION = None
+_session_lock = threading.Lock()
 
 def _get_session():
-    sess = getattr(_thread_local, "session", None)
-    if sess is None:
-        sess = requests.Session()
-        retry = Retry(
-            total=HTTP_CONFIG.get("retries", 3),
-            backoff_factor=0.2,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["POST", "GET"],
-            raise_on_status=False,
-        )
-        adapter = HTTPAdapter(pool_connections=HTTP_CONFIG.get("pool_maxsize", 50),
-                              pool_maxsize=HTTP_CONFIG.get("pool_maxsize", 50),
-                              max_retries=retry)
-        sess.mount('https://', adapter)
-        sess.mount('http://', adapter)
-        _thread_local.session = sess
-    return sess
+    global _SESSION
+    if _SESSION is None:
+        with _session_lock:
+            if _SESSION is None:
+                sess = requests.Session()
+                # Los reintentos (429/5xx y errores de conexión) los gestiona urllib3, respetando Retry-After
+                retry = _JitterRetry(
+                    total=HTTP_CONFIG.get("retries", 3),
+                    backoff_factor=0.5,
+                    status_forcelist=[429, 500, 502, 503, 504],
+                    allowed_methods=["POST", "GET"],
+                    raise_on_status=False,
+                )
+                # Un único host (el endpoint de Translator): un solo pool, con pool_maxsize conexiones keep-alive
+                adapter = HTTPAdapter(pool_connections=1,
+                                      pool_maxsize=HTTP_CONFIG.get("pool_maxsize", 50),
+                                      max_retries=retry)
+                sess.mount('https://', adapter)
+                sess.mount('http://', adapter)
+                _SESSION = sess
+    return _SESSION
+
+# Cupo global de peticiones HTTP en vuelo, compartido por todos los idiomas y batches (--max-workers).
+# Nunca supera el pool de conexiones para no saturarlo (evita "Connection pool is full").
+_HTTP_SLOTS = None
+
+def _get_http_slots():
+    global _HTTP_SLOTS
+    if _HTTP_SLOTS is None:
+        with _session_lock:
+            if _HTTP_SLOTS is None:
+                pool_maxsize = HTTP_CONFIG.get("pool_maxsize", 50)
+                limit = min(HTTP_CONFIG.get("max_in_flight") or pool_maxsize, pool_maxsize)
+                _HTTP_SLOTS = threading.BoundedSemaphore(max(1, limit))
+    return _HTTP_SLOTS
+
+class _CharRateLimiter:
+    """Token bucket de caracteres por minuto compartido por todos los hilos.
+    Cada petición reserva su coste por adelantado y espera (fuera del lock) hasta que el cubo lo cubre,
+    así se respeta la cuota del servicio antes de recibir 429 en lugar de reintentar después.
+    """
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount):
+        # Una petición mayor que el cubo entero solo espera a que se llene
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+_RATE_LIMITER = None
+
+def _get_rate_limiter():
+    """Devuelve el limitador de caracteres por minuto, o None si no hay límite configurado."""
+    global _RATE_LIMITER
+    if _RATE_LIMITER is None and HTTP_CONFIG.get("chars_per_minute"):
+        with _session_lock:
+            if _RATE_LIMITER is None:
+                _RATE_LIMITER = _CharRateLimiter(HTTP_CONFIG["chars_per_minute"])
+    return _RATE_LIMITER
+
+# Patrones precompilados de translate_text y del saneado para Android
+# Texto compuesto únicamente por placeholders de formato, escapes y espacios (no se traduce).
+# Alternativas disjuntas: la coincidencia es lineal aunque el texto sea largo.
+_ONLY_PLACEHOLDERS_RE = re.compile(r'(?:\s|%%|%[0-9]*\$?[sdif]|\\[nt"\'\\]|\\u[0-9a-fA-F]{4})+')
+# Placeholders de formato, escapes, [tokens] y {llaves} que se preservan sin traducir.
+# Una alternativa por carácter inicial (%, \, [, {); la barra escapada (\\) se toma entera para que
+# en "\\n" no se lea un salto de línea escapado.
+_PLACEHOLDER_RE = re.compile(
+    r'%(?:[0-9]+\$)?[sdif]'
+    r'|\\(?:[\'"\nntrb\\]|u[0-9a-fA-F]{4})'
+    r'|\[[^\]]*\]'
+    r'|\{(?:\d+|[a-zA-Z_]+)\}'
+)
+# Placeholder protegido en modo text_type=html (el servicio no traduce el contenido de notranslate),
+# con los espacios que el traductor haya dejado a sus lados
+_NOTRANSLATE_RE = re.compile(r'( *)<span\s+class="notranslate"\s*>(.*?)</span>( *)', re.S)
+# Posición justo antes de una comilla simple o doble sin escapar: se inserta "\" en una sola pasada.
+# El match es vacío y la sustitución literal, así re.sub no expande grupos por cada comilla.
+_UNESCAPED_QUOTE_RE = re.compile(r'(?<!\\)(?=[\'"])')
+# Cualquier comilla (ASCII o tipográfica): sin ninguna, el saneado no cambia el texto
+_ANY_QUOTE_RE = re.compile('[\'"’‘“”]')
+
+# Caché LRU en memoria: (texto, origen, destino, transliterar) -> traducción.
+# Evita repetir peticiones para textos idénticos (etiquetas, unidades, items repetidos en arrays/plurals).
+_TRANSLATION_CACHE = OrderedDict()
+_TRANSLATION_CACHE_MAXSIZE = 100_000
+_translation_cache_lock = threading.Lock()
+
+def _cache_get(key):
+    with _translation_cache_lock:
+        value = _TRANSLATION_CACHE.get(key)
+        if value is not None:
+            _TRANSLATION_CACHE.move_to_end(key)
+        return value
+
+def _cache_put(key, value):
+    with _translation_cache_lock:
+        _TRANSLATION_CACHE[key] = value
+        _TRANSLATION_CACHE.move_to_end(key)
+        if len(_TRANSLATION_CACHE) > _TRANSLATION_CACHE_MAXSIZE:
+            _TRANSLATION_CACHE.popitem(last=False)
+
+# Caché persistente en disco (SQLite) por debajo de la LRU: las ejecuciones incrementales solo piden
+# a la API los textos nuevos o modificados. Se activa con open_disk_cache() (main lo hace por defecto).
+DEFAULT_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "android_xml_translator", "cache.db")
+# Días que una traducción guardada se considera válida (0 = sin caducidad)
+DEFAULT_CACHE_TTL_DAYS = 30
+
+
+class CacheStore:
+    """Almacén SQLite de traducciones: blake2b(servicio|origen|destino|transliterar|texto) -> traducción.
+    "servicio" es MSConfig.cache_scope (endpoint, api-version, textType y category).
+    Una sola conexión compartida entre hilos (protegida con lock), en modo WAL.
+    Las entradas más antiguas que `ttl_days` se ignoran; con `read=False` solo se escribe
+    (sirve para refrescar la caché sin usar lo guardado).
+    """
+
+    # Máximo de parámetros por consulta IN (límite de SQLite en versiones antiguas: 999)
+    _CHUNK = 500
+
+    def __init__(self, path, ttl_days=DEFAULT_CACHE_TTL_DAYS, read=True):
+        self.ttl = int(ttl_days * 86400) if ttl_days else 0
+        self.read = read
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS tr (key BLOB PRIMARY KEY, value TEXT NOT NULL, ts INTEGER NOT NULL)")
+        self._conn.commit()
+
+    @staticmethod
+    def _digest(key, scope):
+        text, source_lang, target_lang, translit = key
+        raw = f"{scope}|{source_lang}|{target_lang}|{int(bool(translit))}|{text}".encode("utf-8")
+        return hashlib.blake2b(raw, digest_size=16).digest()
+
+    def get_many(self, keys):
+        """Devuelve {clave: traducción} para las claves (texto, origen, destino, transliterar) presentes."""
+        if not self.read:
+            return {}
+        min_ts = int(time.time()) - self.ttl if self.ttl else 0
+        scope = (_MS_CFG or freeze_config()).cache_scope
+        by_digest = {self._digest(k, scope): k for k in keys}
+        digests = list(by_digest)
+        found = {}
+        with self._lock:
+            for i in range(0, len(digests), self._CHUNK):
+                chunk = digests[i:i + self._CHUNK]
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM tr WHERE ts >= ? AND key IN ({','.join('?' * len(chunk))})",
+                    [min_ts, *chunk])
+                for digest, value in rows:
+                    found[by_digest[digest]] = value
+        return found
+
+    def put_many(self, items):
+        """Guarda [(clave, traducción), ...] en una sola transacción."""
+        now = int(time.time())
+        scope = (_MS_CFG or freeze_config()).cache_scope
+        rows = [(self._digest(k, scope), v, now) for k, v in items]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO tr (key, value, ts) VALUES (?, ?, ?)", rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_DISK_CACHE = None
+
+def open_disk_cache(path=DEFAULT_CACHE_FILE, ttl_days=DEFAULT_CACHE_TTL_DAYS, read=True):
+    """Activa la caché persistente en `path`. Si no se puede abrir, se avisa y se sigue sin ella."""
+    global _DISK_CACHE
+    try:
+        _DISK_CACHE = CacheStore(path, ttl_days=ttl_days, read=read)
+    except (OSError, sqlite3.Error) as e:
+        print(f"{YELLOW}Warning:{RESET} no se pudo abrir la caché de traducciones {path}: {e}")
+        _DISK_CACHE = None
+    else:
+        atexit.register(_DISK_CACHE.close)
+    return _DISK_CACHE
+
+def _lookup_cached(texts, source_lang, target_langs, translit):
+    """Busca traducciones en la LRU y, si está activa, en la caché en disco (las trae a la LRU).
+    Devuelve ({idioma: lista con lo encontrado o el original}, [(índice, idioma) no encontrados]).
+    Los textos en blanco no se buscan ni se traducen.
+    """
+    results = {lang: list(texts) for lang in target_langs}
+    missing = []
+    for i, text in enumerate(texts):
+        if not text.strip():
+            continue
+        for lang in target_langs:
+            cached = _cache_get((text, source_lang, lang, translit))
+            if cached is None:
+                missing.append((i, lang))
+            else:
+                results[lang][i] = cached
+    if missing and _DISK_CACHE is not None:
+        keys = [(texts[i], source_lang, lang, translit) for i, lang in missing]
+        found = _DISK_CACHE.get_many(keys)
+        still_missing = []
+        for (i, lang), key in zip(missing, keys):
+            value = found.get(key)
+            if value is None:
+                still_missing.append((i, lang))
+            else:
+                results[lang][i] = value
+                _cache_put(key, value)
+        missing = still_missing
+    return results, missing
+
+# Patterns técnicos que indican que NO se debe traducir
+_TECHNICAL_TEXT_PATTERNS = [
+    # SVG/Path data
+    r'^[ML][0-9\s,.-]+[ZCLHVSQTA0-9\s,.-]*$',  # SVG path commands
+    r'path\([^)]+\)',  # path() function calls
+    
+    # URLs y URIs
+    r'^https?://',
+    r'^[a-zA-Z][a-zA-Z0-9+.-]*://',  # URI schemes
+    r'^[\w.+-]+@[\w-]+(\.[\w-]+)+$',  # emails
+
+    # Solo puntuación, símbolos o emoji ("…", "•", "→", "★★★")
+    r'^[\W_]+$',
+    
+    # Valores hexadecimales y códigos
+    r'^#[0-9a-fA-F]+$',
+    r'^0x[0-9a-fA-F]+$',
+    
+    # Coordenadas y valores numéricos puros
+    r'^[\d\s,.()-]+$',
+    
+    # JSON/XML snippets
+    r'^[{[].*[}\]]$',
+    r'^<[^>]+>.*</[^>]+>$',
+    
+    # Nombres de archivos con extensión
+    r'\.[a-zA-Z0-9]{2,4}$',
+    
+    # Expresiones regulares
+    r'\\[dwsWDS]',
+    r'\[\^?\w+\]',
+    
+    # Códigos de programación
+    r'^[a-zA-Z_][a-zA-Z0-9_.]*\([^)]*\)$',  # function calls
+]
+
+# Nombres de strings que típicamente contienen valores técnicos
+_TECHNICAL_NAME_PATTERNS = [
+    r'.*_path(_data)?$',
+    r'.*_easing.*',
+    r'.*_config$',
+    r'.*_url$',
+    r'.*_uri$',
+    r'.*_regex$',
+    r'.*_pattern$',
+    r'.*_format$',
+    r'.*_template$',
+    r'.*_code$',
+    r'.*_id$',
+    r'.*_key$',
+    r'.*_token$',
+]
+# Cada lista se compila en una sola alternancia: un único match() por texto/nombre en lugar de uno por patrón
+_TECHNICAL_TEXT_RE = re.compile('|'.join(f'(?:{p})' for p in _TECHNICAL_TEXT_PATTERNS), re.IGNORECASE)
+_TECHNICAL_NAME_RE = re.compile('|'.join(f'(?:{p})' for p in _TECHNICAL_NAME_PATTERNS), re.IGNORECASE)
 
 def is_technical_string(text: str, name: str = "") -> bool:
     """Detecta si un string contiene valores técnicos que no deben traducirse.
@@ -97,115 +517,112 @@ def is_technical_string(text: str, name: str = "") -> bool:
     
     text = text.strip()
     
-    # Patterns técnicos que indican que NO se debe traducir
-    technical_patterns = [
-        # SVG/Path data
-        r'^[ML][0-9\s,.-]+[ZCLHVSQTA0-9\s,.-]*$',  # SVG path commands
-        r'path\([^)]+\)',  # path() function calls
-        
-        # URLs y URIs
-        r'^https?://',
-        r'^[a-zA-Z][a-zA-Z0-9+.-]*://',  # URI schemes
-        
-        # Valores hexadecimales y códigos
-        r'^#[0-9a-fA-F]+$',
-        r'^0x[0-9a-fA-F]+$',
-        
-        # Coordenadas y valores numéricos puros
-        r'^[\d\s,.()-]+$',
-        
-        # JSON/XML snippets
-        r'^[{[].*[}\]]$',
-        r'^<[^>]+>.*</[^>]+>$',
-        
-        # Nombres de archivos con extensión
-        r'\.[a-zA-Z0-9]{2,4}$',
-        
-        # Expresiones regulares
-        r'\\[dwsWDS]',
-        r'\[\^?\w+\]',
-        
-        # Códigos de programación
-        r'^[a-zA-Z_][a-zA-Z0-9_.]*\([^)]*\)$',  # function calls
-    ]
-    
-    # Nombres de strings que típicamente contienen valores técnicos
-    technical_name_patterns = [
-        r'.*_path(_data)?$',
-        r'.*_easing.*',
-        r'.*_config$',
-        r'.*_url$',
-        r'.*_uri$',
-        r'.*_regex$',
-        r'.*_pattern$',
-        r'.*_format$',
-        r'.*_template$',
-        r'.*_code$',
-        r'.*_id$',
-        r'.*_key$',
-        r'.*_token$',
-    ]
-    
     # Verificar si el contenido del texto es técnico
-    for pattern in technical_patterns:
-        if re.match(pattern, text, re.IGNORECASE):
-            return True
+    if _TECHNICAL_TEXT_RE.match(text):
+        return True
     
     # Verificar si el nombre del string indica contenido técnico
-    for pattern in technical_name_patterns:
-        if re.match(pattern, name, re.IGNORECASE):
-            return True
-    
-    return False
+    return bool(_TECHNICAL_NAME_RE.match(name))
 
-def extract_strings(xml_file):
-    """Extract strings from an Android strings.xml file"""
-    tree = ET.parse(xml_file)
-    root = tree.getroot()
-    
-    strings = {}
-    
-    # Extract regular string elements
-    for string_elem in root.findall("string"):
-        name = string_elem.get("name")
-        translatable = string_elem.get("translatable", "true").lower()
-        
-        if name and string_elem.text and translatable != "false":
+# Hasta este tamaño el archivo se lee y parsea de una vez (más rápido que iterparse); por encima, streaming
+_ONE_SHOT_PARSE_MAX = 10 * 1024 * 1024
+
+# Valores de translatable que aapt2 (ResourceUtils::ParseBool, tras quitar espacios) entiende como falso
+_FALSE_VALUES = frozenset(("false", "False", "FALSE"))
+
+def _extract_resource(elem, strings, skipped):
+    """Añade a `strings` las entradas traducibles de un recurso de primer nivel (<string>, <string-array>, <plurals>).
+    Los strings técnicos omitidos se anotan en `skipped` como (etiqueta, texto).
+    """
+    # La mayoría de recursos no lleva translatable: solo entonces se quita espacio y se compara
+    translatable = elem.get("translatable")
+    if translatable is not None and translatable.strip() in _FALSE_VALUES:
+        return
+    tag = elem.tag
+    name = elem.get("name")
+
+    if tag == "string":
+        text = elem.text
+        if name and text:
             # Verificar si es un string técnico que no debe traducirse
-            if is_technical_string(string_elem.text, name):
-                print(f"{YELLOW}⚠️  Saltando string técnico:{RESET} {name} = {string_elem.text[:50]}...")
+            if is_technical_string(text, name):
+                skipped.append((name, text))
+            else:
+                strings[f"string:{name}"] = text
+
+    elif tag == "string-array" and name:
+        for i, item_elem in enumerate(elem.findall("item")):
+            text = item_elem.text
+            if not text:
                 continue
-            strings[f"string:{name}"] = string_elem.text
-    
-    # Extract string-array elements
-    for array_elem in root.findall("string-array"):
-        array_name = array_elem.get("name")
-        translatable = array_elem.get("translatable", "true").lower()
-        
-        if array_name and translatable != "false":
-            for i, item_elem in enumerate(array_elem.findall("item")):
-                if item_elem.text:
-                    # Verificar si es un item técnico que no debe traducirse
-                    if is_technical_string(item_elem.text, f"{array_name}[{i}]"):
-                        print(f"{YELLOW}⚠️  Saltando array item técnico:{RESET} {array_name}[{i}] = {item_elem.text[:50]}...")
-                        continue
-                    strings[f"array:{array_name}:{i}"] = item_elem.text
-    
-    # Extract plurals elements
-    for plurals_elem in root.findall("plurals"):
-        plurals_name = plurals_elem.get("name")
-        translatable = plurals_elem.get("translatable", "true").lower()
-        
-        if plurals_name and translatable != "false":
-            for item_elem in plurals_elem.findall("item"):
-                quantity = item_elem.get("quantity")
-                if quantity and item_elem.text:
-                    # Verificar si es un plural técnico que no debe traducirse
-                    if is_technical_string(item_elem.text, f"{plurals_name}[{quantity}]"):
-                        print(f"{YELLOW}⚠️  Saltando plural técnico:{RESET} {plurals_name}[{quantity}] = {item_elem.text[:50]}...")
-                        continue
-                    strings[f"plurals:{plurals_name}:{quantity}"] = item_elem.text
-    
+            # Verificar si es un item técnico que no debe traducirse
+            label = f"{name}[{i}]"
+            if is_technical_string(text, label):
+                skipped.append((label, text))
+                continue
+            strings[f"array:{name}:{i}"] = text
+
+    elif tag == "plurals" and name:
+        for item_elem in elem.findall("item"):
+            quantity = item_elem.get("quantity")
+            text = item_elem.text
+            if not quantity or not text:
+                continue
+            # Verificar si es un plural técnico que no debe traducirse
+            label = f"{name}[{quantity}]"
+            if is_technical_string(text, label):
+                skipped.append((label, text))
+                continue
+            strings[f"plurals:{name}:{quantity}"] = text
+
+
+# Ejemplos de strings técnicos omitidos que se muestran (el resto solo se cuenta)
+_SKIPPED_SHOWN = 10
+
+def _report_skipped(skipped):
+    """Un único aviso con el total de strings técnicos omitidos y unos pocos ejemplos."""
+    print(f"{YELLOW}⚠️  Saltando {len(skipped)} strings técnicos:{RESET}")
+    for label, text in skipped[:_SKIPPED_SHOWN]:
+        print(f"   {label} = {text[:50]}...")
+    if len(skipped) > _SKIPPED_SHOWN:
+        print(f"   … y {len(skipped) - _SKIPPED_SHOWN} más")
+
+def extract_strings(xml_file, tree=None):
+    """Extract strings from an Android strings.xml file.
+    Si se pasa `tree` (de load_xml), se recorre ese árbol sin volver a leer el archivo.
+    Los archivos de hasta _ONE_SHOT_PARSE_MAX bytes se leen con una sola lectura y se parsean de una vez;
+    los mayores se recorren en streaming (iterparse): cada recurso de primer nivel se procesa al cerrarse
+    y se libera con clear(), así la memoria no crece con el tamaño del archivo.
+    """
+    strings = {}
+    skipped = []
+
+    if tree is not None or os.path.getsize(xml_file) <= _ONE_SHOT_PARSE_MAX:
+        if tree is not None:
+            root = tree.getroot()
+        else:
+            with open(xml_file, 'rb') as f:
+                data = f.read()
+            root = ET.fromstring(data, ET.XMLParser(**_LXML_PARSE_OPTIONS) if _LXML else None)
+        for elem in root:
+            # lxml también itera comentarios e instrucciones de proceso
+            if isinstance(elem.tag, str):
+                _extract_resource(elem, strings, skipped)
+    else:
+        depth = 0
+        for event, elem in ET.iterparse(xml_file, events=("start", "end"), **_large_file_options(xml_file)):
+            if event == "start":
+                depth += 1
+                continue
+            depth -= 1
+            # Solo hijos directos de <resources>; sus <item> siguen disponibles hasta cerrar el padre
+            if depth != 1:
+                continue
+            _extract_resource(elem, strings, skipped)
+            elem.clear()
+
+    if skipped:
+        _report_skipped(skipped)
     return strings
 
 
@@ -218,10 +635,10 @@ def _escape_android_string(text: str) -> str:
     if text is None:
         return text
     # Normalizar salto de línea
-    s = text.replace("\r\n", "\n")
-    # Escapar apostrofes y comillas no escapadas
-    s = re.sub(r"(?<!\\)'", r"\\'", s)
-    s = re.sub(r'(?<!\\)"', r'\\"', s)
+    s = text.replace("\r\n", "\n") if "\r" in text else text
+    # Escapar apostrofes y comillas no escapadas (solo si hay alguna)
+    if "'" in s or '"' in s:
+        s = _UNESCAPED_QUOTE_RE.sub(r'\\', s)
     # Escapar referencia si el primer no-espacio es @ o ?
     leading_ws_len = len(s) - len(s.lstrip())
     if s[leading_ws_len:leading_ws_len+1] in ('@', '?'):
@@ -232,34 +649,61 @@ def sanitize_for_android_xml(text: str) -> str:
     - Convierte comillas tipográficas a ASCII y las escapa si es necesario.
     - No altera secuencias ya escapadas (usa negative lookbehind).
     """
-    if not text:
+    if not text or not _ANY_QUOTE_RE.search(text):
         return text
     # Normaliza comillas tipográficas a ASCII
+    # (str.replace encadenado es C puro; str.translate con tabla de dict es bastante más lento aquí)
     text = text.replace("’", "'").replace("‘", "'").replace("“", '"').replace("”", '"')
-    # Escapa comillas simples no escapadas
-    text = re.sub(r"(?<!\\)'", r"\\'", text)
-    # Escapa comillas dobles no escapadas
-    text = re.sub(r'(?<!\\)"', r'\\"', text)
-    return text
+    # Escapa comillas simples y dobles no escapadas
+    return _UNESCAPED_QUOTE_RE.sub(r'\\', text)
 
-def translate_text(text, source_lang, target_lang, transliterate=False):
-    """Traduce texto usando Microsoft Translator preservando placeholders. Optimizado para endpoint privado."""
-    if not text.strip():
-        return text
+def _prepare_text(text):
+    """Divide un texto en segmentos ('text' | 'placeholder', valor) listos para traducir.
+    Con text_type=html el texto viaja entero como un único segmento ('markup', html) con los
+    placeholders dentro de <span class="notranslate">, así el servicio ve la frase completa.
+    Devuelve None si no hay nada que traducir (vacío o solo placeholders/escapes).
+    El tipo de texto se lee de la configuración congelada, la misma que usan la petición y la clave de caché.
+    """
+    segments = _split_placeholders(text)
+    if segments is not None and (_MS_CFG or freeze_config()).params["textType"] == "html":
+        return [('markup', _to_markup(segments))]
+    return segments
+
+
+def _to_markup(segments):
+    """Une los segmentos en HTML: texto escapado y placeholders protegidos con notranslate."""
+    return "".join(html.escape(value, quote=False) if kind == 'text'
+                   else f'<span class="notranslate">{html.escape(value, quote=False)}</span>'
+                   for kind, value in segments)
+
+
+def _split_placeholders(text):
+    """Segmenta `text` en ('text' | 'placeholder', valor); None si no hay nada que traducir."""
+    stripped = text.strip()
+    if not stripped:
+        return None
+
+    # Todo placeholder/escape empieza por '%' o '\\' (o es [token]/{llave}): sin esos caracteres,
+    # comprobarlo con `in` evita pasar las regex en la mayoría de strings
+    has_fmt = '%' in text or '\\' in text
+    if not has_fmt and '[' not in text and '{' not in text:
+        return [('text', text)]
 
     # Si el texto solo tiene placeholders/escapes, no traducir
-    if re.match(r'^([%\\][\w\'"\n$]+)+$', text.strip()):
-        return text
+    if has_fmt and _ONLY_PLACEHOLDERS_RE.fullmatch(stripped):
+        return None
 
     # Extraer placeholders
+    # Cada placeholder se queda con los espacios que lo rodean en el original (un espacio compartido
+    # entre dos placeholders seguidos solo cuenta para el primero); al reconstruir mandan esos espacios.
     placeholders = []
     placeholder_positions = []
-    pattern = '%([0-9]+\\$)?[sdif]|%[sdif]|\\\\\'|\\\\\"|\\\\\\n|\\\\n|\\\\t|\\\\r|\\\\b|\\\\u[0-9a-fA-F]{4}|\\[[^\\]]*\\]|\\{\\d+\\}|\\{[a-zA-Z_]+\\}'
-    for match in re.finditer(pattern, text):
+    last_end = 0
+    for match in _PLACEHOLDER_RE.finditer(text):
         start, end = match.span()
         placeholder = match.group(0)
         leading_space = ""
-        if start > 0 and text[start-1] == " ":
+        if start > last_end and text[start-1] == " ":
             leading_space = " "
             start -= 1
         trailing_space = ""
@@ -268,10 +712,13 @@ def translate_text(text, source_lang, target_lang, transliterate=False):
             end += 1
         placeholders.append(leading_space + placeholder + trailing_space)
         placeholder_positions.append((start, end))
+        last_end = end
 
     if not placeholders:
-        translated = _perform_translation(text, source_lang, target_lang, transliterate)
-        return sanitize_for_android_xml(translated)
+        return [('text', text)]
+    # Placeholders que cubren todo el texto (p. ej. "[OK] {0}"): nada que traducir
+    if sum(end - start for start, end in placeholder_positions) == len(text):
+        return None
 
     # Dividir en segmentos traducibles y no traducibles
     segments = []
@@ -283,223 +730,321 @@ def translate_text(text, source_lang, target_lang, transliterate=False):
         last_end = end
     if last_end < len(text):
         segments.append(('text', text[last_end:]))
+    return segments
 
-    text_segments = [segment[1] for segment in segments if segment[0] == 'text']
-
-    if text_segments:
-        delimiter = "⟐⟐⟐SPLIT⟐⟐⟐"
-        combined_text = delimiter.join(text_segments)
-        translated_combined = _perform_translation(combined_text, source_lang, target_lang, transliterate)
-        translated_texts = translated_combined.split(delimiter)
-        if len(translated_texts) != len(text_segments):
-            translated_texts = [
-                _perform_translation(segment, source_lang, target_lang, transliterate)
-                for segment in text_segments
-            ]
-    else:
-        translated_texts = []
 
-    # Reconstruir el texto
-    result = ""
+def _rebuild_text(segments, translated_texts):
+    """Reconstruye el texto traducido intercalando los placeholders originales."""
+    # Caso habitual: un único segmento de texto sin placeholders
+    if len(segments) == 1 and segments[0][0] == 'text':
+        return sanitize_for_android_xml(translated_texts[0] if translated_texts else segments[0][1])
+    if segments[0][0] == 'markup':
+        markup = translated_texts[0] if translated_texts else segments[0][1]
+        return sanitize_for_android_xml(html.unescape(_NOTRANSLATE_RE.sub(_unwrap_notranslate, markup)))
+    # En los dos bordes de cada placeholder se hace lo mismo: se descartan los espacios que el traductor
+    # añada o quite y se ponen los del original (los que lleva el placeholder más los que queden en el
+    # extremo del segmento de texto). Dentro del texto manda el espaciado que devuelva el traductor.
+    parts = []
     text_segment_index = 0
-    for segment_type, segment_value in segments:
-        if segment_type == 'text':
-            if text_segment_index < len(translated_texts):
-                result += translated_texts[text_segment_index]
-                text_segment_index += 1
-            else:
-                result += segment_value
+    last = len(segments) - 1
+    for n, (segment_type, segment_value) in enumerate(segments):
+        if segment_type != 'text':
+            parts.append(segment_value)
+            continue
+        if text_segment_index < len(translated_texts):
+            value = translated_texts[text_segment_index]
+            text_segment_index += 1
         else:
-            result += segment_value
-    placeholder_pattern = r'(\w+)(%[0-9]*\$?[sdif])(\w+)'
-    result = re.sub(placeholder_pattern, r'\1 \2 \3', result)
-    return sanitize_for_android_xml(result)
+            value = segment_value
+        if n > 0:
+            value = segment_value[:len(segment_value) - len(segment_value.lstrip(' '))] + value.lstrip(' ')
+        if n < last:
+            value = value.rstrip(' ') + segment_value[len(segment_value.rstrip(' ')):]
+        parts.append(value)
+    return sanitize_for_android_xml("".join(parts))
+
+
+def _unwrap_notranslate(match):
+    """Sustituye un <span class="notranslate"> por su contenido, con los espacios del placeholder original."""
+    leading, inner, trailing = match.groups()
+    if inner.startswith(' '):
+        leading = ''
+    if inner.endswith(' '):
+        trailing = ''
+    return leading + inner + trailing
+
+
+def translate_text(text, source_lang, target_lang, transliterate=False):
+    """Traduce texto usando Microsoft Translator preservando placeholders. Optimizado para endpoint privado.
+    Los segmentos entre placeholders viajan como elementos independientes de una misma petición.
+    """
+    segments = _prepare_text(text)
+    if segments is None:
+        return text
+    text_segments = [value for kind, value in segments if kind != 'placeholder']
+    translated_texts = _translate_cached(text_segments, source_lang, target_lang, transliterate)
+    return _rebuild_text(segments, translated_texts)
+
+
+def _translate_cached(texts, source_lang, target_lang, transliterate=False):
+    """Traduce una lista de textos a un idioma consultando antes la caché LRU (ver _translate_cached_multi)."""
+    return _translate_cached_multi(texts, source_lang, [target_lang], transliterate)[target_lang]
+
+
+# Códigos de error de Translator (cuerpo {"error": {"code": ...}}) que dependen del tamaño de la petición o de
+# un texto concreto: solo con estos (o un 413) tiene sentido partir el batch. El resto (idioma "to"/"from"
+# inválido, categoría...) fallaría igual en cada mitad.
+_SPLITTABLE_ERROR_CODES = {400050, 400077}
 
+def _error_code(response):
+    """Código de error de Translator de una respuesta fallida, o None si el cuerpo no lo trae."""
+    try:
+        return int(_json_response(response)["error"]["code"])
+    except Exception:
+        return None
 
-def _perform_translation(text_or_batch, source_lang, target_lang, transliterate=False, batch_mode=False):
-    """Realiza la traducción usando Microsoft Translator API. Soporta batch de múltiples segmentos de UN texto."""
+def _should_split(error):
+    """True si la petición fue rechazada por su tamaño o por un elemento y conviene partir el batch."""
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    return status == 413 or (status == 400 and _error_code(response) in _SPLITTABLE_ERROR_CODES)
+
+
+def _translate_cached_multi(texts, source_lang, target_langs, transliterate=False):
+    """Traduce una lista de textos a varios idiomas consultando antes la caché (LRU y disco).
+    Solo los textos no cacheados se envían, juntos en un único batch y con todos los idiomas que les falten
+    en la misma petición (to=fr&to=es...). Devuelve {idioma: [traducciones en el orden de entrada]}.
+    Las traducciones fallidas (se devuelve el original) no se cachean.
+    """
+    translit = bool(transliterate)
+    results, missing = _lookup_cached(texts, source_lang, target_langs, translit)
+    # Textos repetidos dentro de la misma llamada se piden una sola vez: {texto: [índices]}
+    misses = {}
+    for i, _ in missing:
+        positions = misses.setdefault(texts[i], [])
+        if not positions or positions[-1] != i:
+            positions.append(i)
+    missing_langs = list(dict.fromkeys(lang for _, lang in missing))
+
+    if misses:
+        try:
+            fresh = _perform_translation(list(misses), source_lang, missing_langs, transliterate,
+                                         batch_mode=True, raise_on_error=True)
+        except requests.exceptions.RequestException as e:
+            if len(misses) > 1 and _should_split(e):
+                # Petición rechazada por tamaño o por un texto: se parte en dos y se reintenta,
+                # así solo queda sin traducir el texto problemático y no el batch entero
+                pending = list(misses)
+                half = len(pending) // 2
+                for part in (pending[:half], pending[half:]):
+                    sub = _translate_cached_multi(part, source_lang, missing_langs, transliterate)
+                    for j, text in enumerate(part):
+                        for lang in missing_langs:
+                            for i in misses[text]:
+                                results[lang][i] = sub[lang][j]
+                return results
+            print(f"Translation error after retries: {e}")
+            return results
+        new_items = []
+        for (text, positions), per_lang in zip(misses.items(), fresh):
+            # Solo los idiomas que vinieron en la respuesta; los ausentes quedan con el original y sin cachear
+            for lang, translated in per_lang.items():
+                key = (text, source_lang, lang, translit)
+                for i in positions:
+                    results[lang][i] = translated
+                _cache_put(key, translated)
+                new_items.append((key, translated))
+        if _DISK_CACHE is not None:
+            _DISK_CACHE.put_many(new_items)
+    return results
+
+
+def _json_response(resp):
+    """Decodifica el JSON de la respuesta con orjson si está disponible (mismos errores que resp.json())."""
+    if orjson is None:
+        return resp.json()
+    try:
+        return orjson.loads(resp.content)
+    except orjson.JSONDecodeError as e:
+        raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos) from e
+
+
+def _perform_translation(text_or_batch, source_lang, target_lang, transliterate=False, batch_mode=False, raise_on_error=False):
+    """Realiza la traducción usando Microsoft Translator API. Soporta batch de múltiples segmentos de UN texto.
+    target_lang puede ser una lista de idiomas: se piden todos en la misma petición y cada resultado es
+    entonces un dict {idioma: traducción}.
+    Con raise_on_error=True los fallos definitivos (también una respuesta 200 vacía o sin un resultado por texto)
+    se propagan en lugar de devolver el texto original, y los idiomas que falten en un resultado se omiten
+    en vez de rellenarse con el original, para que el llamador no los cachee como traducciones.
+    """
+    multi_target = isinstance(target_lang, (list, tuple))
+    target_langs = list(target_lang) if multi_target else [target_lang]
     if batch_mode:
         texts = text_or_batch
     else:
         if not text_or_batch.strip():
-            return text_or_batch
+            return {lang: text_or_batch for lang in target_langs} if multi_target else text_or_batch
         texts = [text_or_batch]
 
-    endpoint = MS_TRANSLATOR_CONFIG.get("endpoint") or "https://api.cognitive.microsofttranslator.com"
-    key = MS_TRANSLATOR_CONFIG.get("key")
-    region = MS_TRANSLATOR_CONFIG.get("region")
-    api_version = MS_TRANSLATOR_CONFIG.get("api_version", "3.0")
-    category = MS_TRANSLATOR_CONFIG.get("category")
-    text_type = MS_TRANSLATOR_CONFIG.get("text_type", "plain")
+    def _untranslated():
+        results = [{lang: t for lang in target_langs} if multi_target else t for t in texts]
+        return results if batch_mode else results[0]
 
-    if not key:
+    cfg = _MS_CFG or freeze_config()
+    if not cfg.key:
         raise RuntimeError("Falta la clave de Microsoft Translator. Usa --ms-key o AZURE_TRANSLATOR_KEY.")
 
-    url = endpoint.rstrip('/') + "/translate"
+    params = _request_params(source_lang, tuple(target_langs), bool(transliterate))
 
-    params = {
-        "api-version": api_version,
-        "to": target_lang,
-        "textType": text_type,
-    }
-    # Permitir auto-detección si source_lang == 'auto'
-    if source_lang and str(source_lang).lower() != 'auto':
-        params["from"] = source_lang
-    if category:
-        params["category"] = category
-    if transliterate:
-        params["toScript"] = "Latn"
+    body = [{"text": t} for t in texts]
+    payload = {"data": orjson.dumps(body)} if orjson is not None else {"json": body}
 
-    headers = {
-        "Ocp-Apim-Subscription-Key": key,
-    "Content-Type": "application/json",
-    "Accept": "application/json",
-    "Connection": "keep-alive",
-    }
-    if region:
-        headers["Ocp-Apim-Subscription-Region"] = region
+    limiter = _get_rate_limiter()
+    if limiter is not None:
+        # Azure cuenta cada carácter una vez por idioma destino; se espera antes de ocupar un cupo HTTP
+        limiter.acquire(sum(map(len, texts)) * len(target_langs))
+    _wait_if_throttled()
 
-    body = [{"text": t} for t in texts]
+    try:
+        with _get_http_slots():
+            resp = _get_session().post(cfg.url, params=params, headers=cfg.headers, timeout=HTTP_CONFIG.get("timeout", 30), **payload)
+        # Con raise_on_status=False, al agotar los reintentos se recibe la última respuesta 429/5xx
+        resp.raise_for_status()
+        data = _json_response(resp)
+    except requests.exceptions.RequestException as e:
+        if raise_on_error:
+            raise
+        print(f"Translation error after retries: {e}")
+        return _untranslated()
 
-    attempts = 0
-    max_attempts = max(1, HTTP_CONFIG.get("retries", 3))
-    backoff = 0.2
-    session = _get_session()
-    while attempts < max_attempts:
-        attempts += 1
-        try:
-            resp = session.post(url, params=params, headers=headers, json=body, timeout=HTTP_CONFIG.get("timeout", 30))
-            if resp.status_code in (429, 500, 502, 503, 504):
-                time.sleep(backoff + random.uniform(0, 0.3))
-                backoff *= 2
+    if raise_on_error and not (isinstance(data, list) and len(data) == len(texts)):
+        got = f"{len(data)} resultados" if isinstance(data, list) else type(data).__name__
+        raise requests.exceptions.RequestException(
+            f"Respuesta inesperada de Translator: {got} para {len(texts)} textos", response=resp)
+    if not isinstance(data, list) or not data:
+        return _untranslated()
+    results = []
+    for i, item in enumerate(data):
+        # Una traducción por idioma destino, en el mismo orden que los parámetros "to"
+        per_lang = {}
+        translations = item.get("translations") if isinstance(item, dict) else None
+        for lang, tr in zip(target_langs, translations or []):
+            if not isinstance(tr, dict):
                 continue
-            resp.raise_for_status()
-            data = resp.json()
-            if not isinstance(data, list) or not data:
-                return [t for t in texts] if batch_mode else texts[0]
-            results = []
-            for i, item in enumerate(data):
-                translations = item.get("translations", [])
-                if not translations:
-                    results.append(texts[i])
+            if transliterate:
+                translit_obj = tr.get("transliteration")
+                if translit_obj and translit_obj.get("text"):
+                    per_lang[lang] = translit_obj["text"]
                     continue
-                t0 = translations[0]
-                if transliterate:
-                    translit_obj = t0.get("transliteration")
-                    if translit_obj and translit_obj.get("text"):
-                        results.append(translit_obj["text"])
-                        continue
-                results.append(t0.get("text", texts[i]))
-            return results if batch_mode else results[0]
-        except requests.exceptions.RequestException as e:
-            if attempts >= 3:
-                print(f"Translation error after retries: {e}")
-                return [t for t in texts] if batch_mode else texts[0]
-            time.sleep(backoff + random.uniform(0, 0.2))
+            if tr.get("text") is not None:
+                per_lang[lang] = tr["text"]
+        if not raise_on_error:
+            for lang in target_langs:
+                per_lang.setdefault(lang, texts[i])
+        results.append(per_lang if multi_target else per_lang.get(target_lang))
+    return results if batch_mode else results[0]
+
 
+def _large_file_options(xml_file):
+    """Opciones de lxml para un archivo: por encima de _ONE_SHOT_PARSE_MAX se añade huge_tree (sin los límites
+    de tamaño/profundidad de libxml2, para catálogos muy grandes); el resto se parsea con los límites normales."""
+    if _LXML and os.path.getsize(xml_file) > _ONE_SHOT_PARSE_MAX:
+        return dict(_LXML_PARSE_OPTIONS, huge_tree=True)
+    return _LXML_PARSE_OPTIONS
 
-def _fallback_translate(text, source_lang, target_lang, transliterate=False):
-    """Obsoleto: ya no se usan servicios de respaldo externos."""
-    return text
 
+def load_xml(xml_file):
+    """Parsea un strings.xml. Permite parsear una vez y reutilizar el árbol como plantilla."""
+    parser = ET.XMLParser(**_large_file_options(xml_file)) if _LXML else None
+    return ET.parse(xml_file, parser)
+
+
+def _write_xml(tree, path):
+    """Serializa el árbol completo al archivo.
+    Con lxml se escribe en streaming desde C (sin construir el documento entero en memoria);
+    con ElementTree se genera en bytes y se escribe con una sola llamada (su write() hace una por fragmento).
+    """
+    # Sin serializador propio a propósito: el árbol conserva comentarios, namespaces (xliff:g), marcado
+    # dentro de <string>, atributos y recursos no traducibles (dimen, color...), que un volcado a mano perdería.
+    if _LXML:
+        with open(path, 'wb') as f:
+            # Misma declaración que con ElementTree (lxml escribiría encoding='UTF-8')
+            f.write(b"<?xml version='1.0' encoding='utf-8'?>\n")
+            tree.write(f, encoding='utf-8', xml_declaration=False)
+        return
+    data = ET.tostring(tree.getroot(), encoding='utf-8', xml_declaration=True)
+    with open(path, 'wb') as f:
+        f.write(data)
 
-def create_translated_xml(original_file, strings_dict, target_lang, output_path=None):
+
+def _index_elements(root):
+    """Indexa en una sola pasada los elementos del árbol por su clave (string:/array:/plurals:).
+    Devuelve (elementos_por_clave, arrays_por_nombre, plurals_por_nombre).
+    """
+    elements = {}
+    arrays_by_name = {}
+    plurals_by_name = {}
+    for elem in root:
+        tag = elem.tag
+        if tag == "string":
+            elements.setdefault(f"string:{elem.get('name')}", elem)
+        elif tag == "string-array":
+            name = elem.get("name")
+            arrays_by_name.setdefault(name, elem)
+            for i, item_elem in enumerate(elem.findall("item")):
+                elements.setdefault(f"array:{name}:{i}", item_elem)
+        elif tag == "plurals":
+            name = elem.get("name")
+            plurals_by_name.setdefault(name, elem)
+            for item_elem in elem.findall("item"):
+                elements.setdefault(f"plurals:{name}:{item_elem.get('quantity')}", item_elem)
+    return elements, arrays_by_name, plurals_by_name
+
+
+def create_translated_xml(original_file, strings_dict, target_lang, output_path=None, template=None, copy_template=True):
     """Create a new XML file with translated strings.
     - Si faltan claves en el XML base, se crearán nuevos elementos.
     - Si output_path se proporciona, se escribe ahí (en lugar de strings-<target>.xml).
+    - Si template (árbol de load_xml) se proporciona, se muta una copia en memoria en vez de re-parsear original_file;
+      con copy_template=False se muta el propio template (cuando no se va a reutilizar).
     """
-    tree = ET.parse(original_file)
-    root = tree.getroot()
-    
-    # Track string-arrays to update
-    arrays_updated = set()
-    
-    # Track plurals to update
-    plurals_updated = set()
-    
-    # Índices existentes para detección de faltantes
-    existing_strings = set()
-    existing_arrays = set()
-    existing_plurals = set()
-
-    # Update regular strings
-    for string_elem in root.findall("string"):
-        name = string_elem.get("name")
-        key = f"string:{name}"
-        if key in strings_dict:
-            string_elem.text = _escape_android_string(strings_dict[key])
-        existing_strings.add(name)
-    
-    # Update string-arrays
-    for array_elem in root.findall("string-array"):
-        array_name = array_elem.get("name")
-
-        # Check if this array has any translated items
-        array_has_translations = False
-        for i, item_elem in enumerate(array_elem.findall("item")):
-            key = f"array:{array_name}:{i}"
-            if key in strings_dict:
-                array_has_translations = True
-                break
-
-        if array_has_translations:
-            arrays_updated.add(array_name)
-            # Update the items
-            for i, item_elem in enumerate(array_elem.findall("item")):
-                key = f"array:{array_name}:{i}"
-                if key in strings_dict:
-                    item_elem.text = _escape_android_string(strings_dict[key])
-        existing_arrays.add(array_name)
+    if template is not None and not copy_template:
+        tree = template
+        root = tree.getroot()
+    elif template is not None:
+        root = copy.deepcopy(template.getroot())
+        tree = ET.ElementTree(root)
+    else:
+        tree = load_xml(original_file)
+        root = tree.getroot()
     
-    # Update plurals
-    for plurals_elem in root.findall("plurals"):
-        plurals_name = plurals_elem.get("name")
-        
-        # Check if this plural has any translated items
-        plurals_has_translations = False
-        for item_elem in plurals_elem.findall("item"):
-            quantity = item_elem.get("quantity")
-            key = f"plurals:{plurals_name}:{quantity}"
-            if key in strings_dict:
-                plurals_has_translations = True
-                break
-                
-        if plurals_has_translations:
-            plurals_updated.add(plurals_name)
-            # Update the items
-            for item_elem in plurals_elem.findall("item"):
-                quantity = item_elem.get("quantity")
-                key = f"plurals:{plurals_name}:{quantity}"
-                if key in strings_dict:
-                    item_elem.text = _escape_android_string(strings_dict[key])
-        existing_plurals.add(plurals_name)
-
-    # Agregar elementos faltantes (strings nuevos)
-    for k, v in strings_dict.items():
-        if k.startswith("string:"):
-            _, name = k.split(":", 1)
-            if name not in existing_strings:
-                new_elem = ET.Element("string", {"name": name})
-                new_elem.text = _escape_android_string(v)
-                root.append(new_elem)
-
-    # Agregar arrays/plurals faltantes
-    # Recolectar por nombre
+    elements, arrays_by_name, plurals_by_name = _index_elements(root)
+
+    # Una búsqueda por clave traducida; las claves que no existen en el XML base se crean después
     arrays_buffer = {}
     plurals_buffer = {}
-    for k, v in strings_dict.items():
-        if k.startswith("array:"):
-            _, rest = k.split(":", 1)
+    for key, value in strings_dict.items():
+        elem = elements.get(key)
+        if elem is not None:
+            elem.text = _escape_android_string(value)
+            continue
+        kind, rest = key.split(":", 1)
+        if kind == "string":
+            # Agregar elementos faltantes (strings nuevos)
+            new_elem = ET.Element("string", {"name": rest})
+            new_elem.text = _escape_android_string(value)
+            root.append(new_elem)
+        elif kind == "array":
             arr_name, idx = rest.split(":", 1)
-            arrays_buffer.setdefault(arr_name, {})[int(idx)] = v
-        elif k.startswith("plurals:"):
-            _, rest = k.split(":", 1)
+            arrays_buffer.setdefault(arr_name, {})[int(idx)] = value
+        elif kind == "plurals":
             pl_name, quantity = rest.split(":", 1)
-            plurals_buffer.setdefault(pl_name, {})[quantity] = v
+            plurals_buffer.setdefault(pl_name, {})[quantity] = value
 
     # Crear arrays faltantes
     for arr_name, items in arrays_buffer.items():
-        if arr_name not in existing_arrays:
+        array_elem = arrays_by_name.get(arr_name)
+        if array_elem is None:
             arr_elem = ET.Element("string-array", {"name": arr_name})
             for i in sorted(items.keys()):
                 it = ET.Element("item")
@@ -508,37 +1053,24 @@ def create_translated_xml(original_file, strings_dict, target_lang, output_path=
             root.append(arr_elem)
         else:
             # Si el array existe, agregar items faltantes al final
-            for array_elem in root.findall("string-array"):
-                if array_elem.get("name") == arr_name:
-                    existing_count = len(array_elem.findall("item"))
-                    max_idx = max(items.keys()) if items else -1
-                    # Añadir desde existing_count hasta max_idx si faltan
-                    for i in range(existing_count, max_idx + 1):
-                        if i in items:
-                            it = ET.Element("item")
-                            it.text = _escape_android_string(items[i])
-                            array_elem.append(it)
-                    break
+            existing_count = len(array_elem.findall("item"))
+            for i in sorted(items.keys()):
+                if i >= existing_count:
+                    it = ET.Element("item")
+                    it.text = _escape_android_string(items[i])
+                    array_elem.append(it)
 
     # Crear plurals faltantes
     for pl_name, qty_map in plurals_buffer.items():
-        if pl_name not in existing_plurals:
+        pl_elem = plurals_by_name.get(pl_name)
+        if pl_elem is None:
             pl_elem = ET.Element("plurals", {"name": pl_name})
-            for qty, txt in qty_map.items():
-                it = ET.Element("item", {"quantity": qty})
-                it.text = _escape_android_string(txt)
-                pl_elem.append(it)
             root.append(pl_elem)
-        else:
-            for pl_elem in root.findall("plurals"):
-                if pl_elem.get("name") == pl_name:
-                    existing_qty = {it.get("quantity") for it in pl_elem.findall("item")}
-                    for qty, txt in qty_map.items():
-                        if qty not in existing_qty:
-                            it = ET.Element("item", {"quantity": qty})
-                            it.text = _escape_android_string(txt)
-                            pl_elem.append(it)
-                    break
+        # Las cantidades presentes en el índice ya se actualizaron; aquí solo llegan las que faltan
+        for qty, txt in qty_map.items():
+            it = ET.Element("item", {"quantity": qty})
+            it.text = _escape_android_string(txt)
+            pl_elem.append(it)
     
     # Determine output file: por requisito, sobrescribir el archivo original salvo que se provea output_path
     translated_file = output_path or original_file
@@ -549,45 +1081,155 @@ def create_translated_xml(original_file, strings_dict, target_lang, output_path=
         os.makedirs(out_dir, exist_ok=True)
 
     # Write the translated XML
-    tree.write(translated_file, encoding='utf-8', xml_declaration=True)
+    _write_xml(tree, translated_file)
     return translated_file
 
 
 def translate_strings_for_language(strings, source_lang, target_lang, transliterate=False):
     """Traduce todos los strings para un idioma destino (placeholder-safe)."""
-    translated_strings = {}
-    total = len(strings)
+    return translate_strings_for_languages(strings, source_lang, [target_lang], transliterate)[target_lang]
+
+
+def _make_batches(segments, n_langs=1):
+    """Agrupa segmentos en batches consecutivos de hasta HTTP_CONFIG["batch_size"] elementos (como mucho
+    MAX_BATCH_ITEMS) y MAX_BATCH_CHARS caracteres, o MAX_REQUEST_CHARS // n_langs si se piden n_langs idiomas
+    en la misma petición. Un segmento que supere por sí solo el presupuesto va en su propio batch.
+    """
+    max_items = max(1, min(HTTP_CONFIG.get("batch_size") or 100, MAX_BATCH_ITEMS))
+    max_chars = min(MAX_BATCH_CHARS, MAX_REQUEST_CHARS // max(1, n_langs))
+    batches = []
+    batch = []
+    chars = 0
+    for segment in segments:
+        if batch and (len(batch) >= max_items or chars + len(segment) > max_chars):
+            batches.append(batch)
+            batch = []
+            chars = 0
+        batch.append(segment)
+        chars += len(segment)
+    if batch:
+        batches.append(batch)
+    return batches
+
+def _partition_strings(strings):
+    """Clasifica las entradas una sola vez, sin API.
+    Devuelve ({clave: segmentos} de las que hay que traducir, {clave: texto} de las que se copian tal cual:
+    vacías, solo espacios o solo placeholders/escapes).
+    """
+    prepared = {}
+    passthrough = {}
+    for key, text in strings.items():
+        # Vacíos/solo espacios se copian tal cual sin pasar por _prepare_text
+        segments = None if not text or text.isspace() else _prepare_text(text)
+        if segments is None:
+            passthrough[key] = text
+        else:
+            prepared[key] = segments
+    return prepared, passthrough
+
+def translate_strings_for_languages(strings, source_lang, target_langs, transliterate=False):
+    """Traduce todos los strings a varios idiomas destino en una sola pasada (placeholder-safe).
+    Los segmentos de texto de todas las entradas se agrupan en batches (--ms-batch-size / MAX_BATCH_CHARS);
+    cada batch es UNA petición HTTP que pide todos los idiomas a la vez (to=fr&to=es...). Los batches se
+    envían en paralelo (hasta HTTP_CONFIG["concurrency"]).
+    Devuelve {idioma: {clave: traducción}}.
+    """
+    target_langs = list(target_langs)
+    langs_label = ",".join(target_langs)
+    verb = 'Transliterating' if transliterate else 'Translating'
 
     if transliterate:
-        print(f"{BOLD}{CYAN}⟶ Transliterating{RESET} {YELLOW}{source_lang}{RESET} → {GREEN}{target_lang}{RESET} ...")
+        print(f"{BOLD}{CYAN}⟶ Transliterating{RESET} {YELLOW}{source_lang}{RESET} → {GREEN}{langs_label}{RESET} ...")
     else:
-        print(f"{BOLD}{CYAN}⟶ Translating{RESET} {YELLOW}{source_lang}{RESET} → {GREEN}{target_lang}{RESET} ...")
+        print(f"{BOLD}{CYAN}⟶ Translating{RESET} {YELLOW}{source_lang}{RESET} → {GREEN}{langs_label}{RESET} ...")
 
-    for current, (key, text) in enumerate(strings.items(), 1):
-        if key.startswith("string:"):
-            name = key.split(":", 1)[1]
-            if current % 25 == 0 or current == total:
-                print(f"{BLUE}[{target_lang}]{RESET} {'Transliterating' if transliterate else 'Translating'} string {current}/{total}: {name}")
-        elif key.startswith("array:") and (current % 50 == 0 or current == total):
-            parts = key.split(":", 2)
-            print(f"{BLUE}[{target_lang}]{RESET} {'Transliterating' if transliterate else 'Translating'} array {current}/{total}: {parts[1]}[{parts[2]}]")
-        elif key.startswith("plurals:") and (current % 50 == 0 or current == total):
-            parts = key.split(":", 2)
-            print(f"{BLUE}[{target_lang}]{RESET} {'Transliterating' if transliterate else 'Translating'} plural {current}/{total}: {parts[1]}[{parts[2]}]")
+    prepared, passthrough = _partition_strings(strings)
+    if passthrough:
+        print(f"{BLUE}[{langs_label}]{RESET} {len(prepared)} entries to translate, {len(passthrough)} kept as is")
 
-        translated_text = translate_text(text, source_lang, target_lang, transliterate)
-        translated_strings[key] = translated_text
+    # Recolectar los segmentos de texto sin repetir:
+    # unique = {segmento: índice}, order = índice del segmento único para cada aparición
+    unique = {}
+    order = []
+    for segments in prepared.values():
+        for kind, value in segments:
+            if kind != 'placeholder':
+                order.append(unique.setdefault(value, len(unique)))
 
-    return translated_strings
+    unique_segments = list(unique)
 
-def process_language(input_file, source_lang, target_lang, strings, transliterate=False, output_path=None):
-    """Process a single target language"""
-    # Translate all strings for this language
-    translated_strings = translate_strings_for_language(strings, source_lang, target_lang, transliterate)
-    
+    # Resolver primero desde la caché: solo los segmentos a los que les falta algún idioma van a batches
+    translated_unique, missing = _lookup_cached(unique_segments, source_lang, target_langs, bool(transliterate))
+    pending = list(dict.fromkeys(i for i, _ in missing))
+    if len(pending) < len(unique_segments):
+        print(f"{BLUE}[{langs_label}]{RESET} {len(unique_segments) - len(pending)} segments from cache")
+
+    batches = _make_batches([unique_segments[i] for i in pending], len(target_langs))
+    batch_results = [None] * len(batches)
+    if batches:
+        workers = max(1, min(HTTP_CONFIG.get("concurrency", 8), len(batches)))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            future_to_index = {
+                executor.submit(_translate_cached_multi, batch, source_lang, target_langs, transliterate): i
+                for i, batch in enumerate(batches)
+            }
+            # Progreso como mucho ~20 veces por trabajo, no una línea por batch
+            report_every = max(1, len(batches) // 20)
+            for done, future in enumerate(concurrent.futures.as_completed(future_to_index), 1):
+                batch_results[future_to_index[future]] = future.result()
+                if done % report_every == 0 or done == len(batches):
+                    print(f"{BLUE}[{langs_label}]{RESET} {verb} batch {done}/{len(batches)}")
+
+    # Reasignar los segmentos traducidos a sus claves, en el orden original
+    translations = {}
+    for lang in target_langs:
+        for i, t in zip(pending, (t for result in batch_results for t in result[lang])):
+            translated_unique[lang][i] = t
+        translated_segments = [translated_unique[lang][i] for i in order]
+        # Las entradas no traducibles quedan idénticas; solo se sobrescriben las preparadas (mismo orden)
+        translated_strings = dict(strings)
+        offset = 0
+        for key, segments in prepared.items():
+            count = sum(1 for kind, _ in segments if kind != 'placeholder')
+            translated_strings[key] = _rebuild_text(segments, translated_segments[offset:offset + count])
+            offset += count
+        translations[lang] = translated_strings
+
+    return translations
+
+def _compute_stats(strings):
+    """Cuenta strings, arrays y plurals de `strings` en una sola pasada.
+    No depende del idioma destino: se calcula una vez por fichero de entrada.
+    """
+    string_count = array_items_count = plurals_items_count = 0
+    array_names = set()
+    plurals_names = set()
+    for k in strings:
+        # Solo arrays/plurals necesitan el nombre: "array:<nombre>:<i>", "plurals:<nombre>:<cantidad>"
+        kind, _, rest = k.partition(":")
+        if kind == "string":
+            string_count += 1
+        elif kind == "array":
+            array_items_count += 1
+            array_names.add(rest.partition(":")[0])
+        elif kind == "plurals":
+            plurals_items_count += 1
+            plurals_names.add(rest.partition(":")[0])
+    return {
+        "string_count": string_count,
+        "array_count": len(array_names),
+        "array_items_count": array_items_count,
+        "plurals_count": len(plurals_names),
+        "plurals_items_count": plurals_items_count,
+        "total_elements": len(strings),
+    }
+
+def _write_language(input_file, target_lang, stats, translated_strings, transliterate=False, output_path=None, template=None, copy_template=True):
+    """Escribe el XML traducido de un idioma y devuelve sus estadísticas (`stats` + idioma y fichero)."""
     # Create translated XML file
     output_file_suffix = "translit-" + target_lang if transliterate else target_lang
-    output_file = create_translated_xml(input_file, translated_strings, output_file_suffix, output_path=output_path)
+    output_file = create_translated_xml(input_file, translated_strings, output_file_suffix,
+                                        output_path=output_path, template=template, copy_template=copy_template)
     
     # Print completion message
     if transliterate:
@@ -595,23 +1237,79 @@ def process_language(input_file, source_lang, target_lang, strings, transliterat
     else:
         print(f"{GREEN}✓{RESET} Translation to {BOLD}{target_lang}{RESET} completed. File: {output_file}")
     
-    # Return statistics
-    string_count = len([k for k in strings.keys() if k.startswith("string:")])
-    array_items_count = len([k for k in strings.keys() if k.startswith("array:")])
-    array_count = len(set([k.split(":", 2)[1] for k in strings.keys() if k.startswith("array:")]))
-    plurals_items_count = len([k for k in strings.keys() if k.startswith("plurals:")])
-    plurals_count = len(set([k.split(":", 2)[1] for k in strings.keys() if k.startswith("plurals:")]))
-    
-    return {
-        "target_lang": target_lang,
-        "string_count": string_count,
-        "array_count": array_count,
-        "array_items_count": array_items_count,
-        "plurals_count": plurals_count,
-        "plurals_items_count": plurals_items_count,
-        "total_elements": len(strings),
-        "output_file": output_file
-    }
+    return dict(stats, target_lang=target_lang, output_file=output_file)
+
+# Árbol original parseado una vez por proceso de escritura (ver _init_write_worker)
+_WORKER_TEMPLATE = None
+
+def _init_write_worker(input_file):
+    """Inicializador de los procesos de escritura: parsea el XML original una sola vez por proceso."""
+    global _WORKER_TEMPLATE
+    _WORKER_TEMPLATE = load_xml(input_file)
+
+def _write_language_in_worker(*args):
+    """_write_language dentro de un proceso de escritura, usando su plantilla ya parseada."""
+    return _write_language(*args, template=_WORKER_TEMPLATE)
+
+def process_language(input_file, source_lang, target_lang, strings, transliterate=False, output_path=None):
+    """Process a single target language"""
+    return process_all_languages(input_file, source_lang, [target_lang], strings, transliterate,
+                                 output_paths={target_lang: output_path})[0]
+
+def process_all_languages(input_file, source_lang, target_langs, strings, transliterate=False, output_paths=None, max_workers=None, stats=None, use_processes=False, template=None):
+    """Traduce todos los idiomas en una sola pasada y luego escribe un XML por idioma en paralelo.
+    output_paths: {idioma: ruta de salida} opcional (None = comportamiento por defecto de create_translated_xml).
+    stats: resultado de _compute_stats(strings); si no se pasa se calcula aquí una vez.
+    template: árbol ya parseado de input_file (load_xml) para no volver a parsearlo al escribir con hilos;
+    con un solo idioma se muta directamente (sin copia), así que no debe reutilizarse después.
+    max_workers: hilos/procesos de escritura de XML (None = XML_WRITE_WORKERS).
+    use_processes: escribir cada idioma en un proceso aparte (rellenar y serializar el árbol es CPU y,
+    con hilos, comparte el GIL). La traducción (HTTP) se hace siempre una sola vez en este proceso.
+    Devuelve la lista de estadísticas de los idiomas escritos correctamente.
+    """
+    output_paths = output_paths or {}
+    if stats is None:
+        stats = _compute_stats(strings)
+    translations = translate_strings_for_languages(strings, source_lang, target_langs, transliterate)
+    write_workers = max(1, min(max_workers or XML_WRITE_WORKERS, len(target_langs)))
+    executor = None
+    cpus = os.cpu_count() or 1
+    if use_processes and len(target_langs) > 1 and cpus > 1:
+        try:
+            # Cada proceso parsea el original una vez al arrancar y lo reutiliza para todos sus idiomas
+            # (el archivo ya está en la caché del sistema; no se serializa un árbol entre procesos)
+            executor = concurrent.futures.ProcessPoolExecutor(max_workers=min(write_workers, cpus),
+                                                              initializer=_init_write_worker,
+                                                              initargs=(input_file,))
+        except (OSError, NotImplementedError, ImportError) as e:
+            print(f"{YELLOW}Warning:{RESET} no se pueden usar procesos para escribir los XML ({e}); se usan hilos.")
+    if executor is not None:
+        write = _write_language_in_worker
+        extra = {}
+    else:
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=write_workers)
+        write = _write_language
+        # Parsear el XML original una sola vez; cada idioma muta una copia en memoria.
+        # Con un solo idioma no hace falta copia: el único escritor muta la plantilla recibida o, si no hay,
+        # create_translated_xml parsea y muta su propio árbol.
+        if template is None and len(target_langs) > 1:
+            template = load_xml(input_file)
+        extra = {"template": template, "copy_template": len(target_langs) > 1}
+
+    results = []
+    with executor:
+        future_to_lang = {
+            executor.submit(write, input_file, lang, stats, translations[lang],
+                            transliterate, output_paths.get(lang), **extra): lang
+            for lang in target_langs
+        }
+        for future in concurrent.futures.as_completed(future_to_lang):
+            target_lang = future_to_lang[future]
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"Error processing {target_lang}: {e}")
+    return results
 
 def main():
     parser = argparse.ArgumentParser(description='Translate Android strings.xml to multiple languages')
@@ -620,11 +1318,18 @@ def main():
     parser.add_argument('--source-lang', default=os.getenv('AZURE_TRANSLATOR_SOURCE_LANG', 'auto'), help="Source language code (default: 'auto' for autodetect)")
     parser.add_argument('--preserve', action='store_true', help='Preserve untranslated strings')
     parser.add_argument('--in-place', action='store_true', default=True, help='Write translations back into the same input file (overwrites). Default: enabled')
+    parser.add_argument('--no-in-place', dest='in_place', action='store_false', help='Write each language to strings-<lang>.xml next to the input file (allows several target languages)')
     parser.add_argument('--transliterate', action='store_true', help='Use transliteration instead of translation')
-    parser.add_argument('--max-workers', type=int, default=10, help='Maximum number of parallel translation workers (default: 10, recommended for private endpoint)')
+    parser.add_argument('--max-workers', type=int, default=10, help='Maximum number of concurrent translation requests across all languages and batches (default: 10, recommended for private endpoint)')
     parser.add_argument('--http-timeout', type=float, default=float(os.getenv('AZURE_TRANSLATOR_HTTP_TIMEOUT', '30')), help='HTTP request timeout in seconds (default: 30)')
     parser.add_argument('--http-pool-maxsize', type=int, default=int(os.getenv('AZURE_TRANSLATOR_HTTP_POOL_MAXSIZE', '50')), help='Max HTTP connection pool size per process (default: 50)')
     parser.add_argument('--http-retries', type=int, default=int(os.getenv('AZURE_TRANSLATOR_HTTP_RETRIES', '3')), help='Max retry attempts for failed HTTP requests (default: 3)')
+    parser.add_argument('--http-concurrency', type=int, default=int(os.getenv('AZURE_TRANSLATOR_HTTP_CONCURRENCY', '8')), help='Batch requests sent in parallel per translation pass; each request covers all target languages (default: 8, overall cap: --max-workers)')
+    parser.add_argument('--cache-file', default=os.getenv('ANDROID_XML_TRANSLATOR_CACHE', DEFAULT_CACHE_FILE), help=f'SQLite file for the persistent translation cache (default: {DEFAULT_CACHE_FILE})')
+    parser.add_argument('--cache-ttl-days', type=float, default=float(os.getenv('ANDROID_XML_TRANSLATOR_CACHE_TTL_DAYS', DEFAULT_CACHE_TTL_DAYS)), help=f'Ignore cached translations older than this many days, 0 = never expire (default: {DEFAULT_CACHE_TTL_DAYS})')
+    parser.add_argument('--no-cache', action='store_true', help='Do not reuse cached translations; fresh results are still stored in the cache')
+    parser.add_argument('--chars-per-minute', type=int, default=int(os.getenv('AZURE_TRANSLATOR_CHARS_PER_MINUTE', '0')), help='Pace requests to this many characters per minute (text x target languages), matching your Translator quota; 0 = no limit (default: 0)')
+    parser.add_argument('--ms-batch-size', type=int, default=int(os.getenv('AZURE_TRANSLATOR_BATCH_SIZE', '100')), help=f'Text segments per Translator request (default: 100, max: {MAX_BATCH_ITEMS})')
     parser.add_argument('--config', help='Path to a JSON config file with Microsoft Translator settings')
     # Parámetros Microsoft Translator
     parser.add_argument('--ms-endpoint', default=os.getenv('AZURE_TRANSLATOR_ENDPOINT', 'https://api.cognitive.microsofttranslator.com'), help='Microsoft Translator endpoint URL')
@@ -672,6 +1377,9 @@ def main():
                         "timeout": loaded.get("http_timeout"),
                         "pool_maxsize": loaded.get("http_pool_maxsize"),
                         "retries": loaded.get("http_retries"),
+                        "concurrency": loaded.get("http_concurrency"),
+                        "batch_size": loaded.get("batch_size"),
+                        "chars_per_minute": loaded.get("chars_per_minute"),
                     }
         except Exception as e:
             print(f"Warning: No se pudo leer el archivo de configuración: {e}")
@@ -719,7 +1427,7 @@ def main():
                         base[k] = float(v)
                     except Exception:
                         pass
-                elif k in ("pool_maxsize", "retries"):
+                elif k in ("pool_maxsize", "retries", "concurrency", "batch_size", "chars_per_minute"):
                     try:
                         base[k] = int(v)
                     except Exception:
@@ -733,19 +1441,29 @@ def main():
         "timeout": args.http_timeout,
         "pool_maxsize": args.http_pool_maxsize,
         "retries": args.http_retries,
+        "concurrency": args.http_concurrency,
+        "batch_size": args.ms_batch_size,
+        "chars_per_minute": args.chars_per_minute,
     })
+    HTTP_CONFIG["max_in_flight"] = args.max_workers
 
     if not MS_TRANSLATOR_CONFIG.get("key"):
         print("Error: Debes proporcionar la clave de Microsoft Translator con --ms-key o AZURE_TRANSLATOR_KEY.")
         return
+    freeze_config()
+    open_disk_cache(args.cache_file, ttl_days=args.cache_ttl_days, read=not args.no_cache)
 
     print(f"{BOLD}Extracting strings from{RESET} {args.input_file} …")
-    strings = extract_strings(args.input_file)
+    # Archivos normales: un solo parseo compartido por la extracción y la escritura (plantilla);
+    # los muy grandes se extraen en streaming y se parsean aparte al escribir
+    tree = load_xml(args.input_file) if os.path.getsize(args.input_file) <= _ONE_SHOT_PARSE_MAX else None
+    strings = extract_strings(args.input_file, tree=tree)
+    stats = _compute_stats(strings)
     print(f"{YELLOW}Found{RESET} {len(strings)} translatable entries.")
     
     # Show summary of work to be done
     if args.in_place and len(args.target_langs) > 1:
-        print(f"Error: En modo in-place solo se permite un idioma destino. Pasa un único código de idioma o desactiva in-place.")
+        print(f"Error: En modo in-place solo se permite un idioma destino. Pasa un único código de idioma o usa --no-in-place.")
         return
 
     print(f"\n{BOLD}Preparing{RESET} to process {len(args.target_langs)} target languages:")
@@ -757,34 +1475,25 @@ def main():
     
     print("\nStarting parallel processing...")
     
-    # Create a thread pool executor
-    max_workers = min(args.max_workers, len(args.target_langs))
-    results = []
-    
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit tasks for each target language
-        future_to_lang = {}
-        for target_lang in args.target_langs:
-            out_path = args.input_file if args.in_place else None
-            fut = executor.submit(
-                process_language,
-                args.input_file,
-                args.source_lang,
-                target_lang,
-                strings,
-                args.transliterate,
-                out_path,
-            )
-            future_to_lang[fut] = target_lang
-        
-        # Process results as they complete
-        for future in concurrent.futures.as_completed(future_to_lang):
-            target_lang = future_to_lang[future]
-            try:
-                result = future.result()
-                results.append(result)
-            except Exception as e:
-                print(f"Error processing {target_lang}: {e}")
+    # Una sola pasada de traducción para todos los idiomas; la escritura de XML se reparte por idioma
+    output_paths = {}
+    for target_lang in args.target_langs:
+        if args.in_place:
+            output_paths[target_lang] = args.input_file
+        else:
+            suffix = "translit-" + target_lang if args.transliterate else target_lang
+            output_paths[target_lang] = os.path.join(os.path.dirname(args.input_file), f"strings-{suffix}.xml")
+    results = process_all_languages(
+        args.input_file,
+        args.source_lang,
+        args.target_langs,
+        strings,
+        args.transliterate,
+        output_paths,
+        stats=stats,
+        use_processes=len(args.target_langs) > 1,
+        template=tree,
+    )
     
     # Print final summary
     print(f"\n{BOLD}=== Translation Summary ==={RESET}")
@@ -13,12 +13,16 @@ Nota sobre directorios de recursos Android:
   a partir de res/values/strings.xml. Android detecta localización por directorio, no por nombre de archivo.
 
 Advertencia sobre códigos de idioma:
-- Se admite mapeo simple de BCP-47: "es" -> values-es; "pt-BR" -> values-pt-rBR.
-  Casos avanzados (script/variante) pueden requerir ajuste manual.
+- Mapeo de BCP-47: "es" -> values-es; "pt-BR" -> values-pt-rBR; "he" -> values-iw;
+  con script o región numérica se usa el formato b+ ("zh-Hans" -> values-b+zh+Hans).
 """
 
 import argparse
+import collections
+import concurrent.futures
+import functools
 import os
+import re
 import shutil
 import subprocess
 import sys
@@ -56,28 +60,89 @@ def ensure_tool(cmd_name: str, custom_path: Optional[str] = None, required: bool
     return None
 
 
+def apktool_jobs_args(apktool: str, jobs: Optional[int]) -> List[str]:
+    """Argumentos -j para apktool (decodificar/compilar en paralelo), solo si la versión lo admite (>= 2.9)."""
+    if not jobs or jobs <= 1:
+        return []
+    try:
+        out = subprocess.run([apktool, "--version"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                             text=True, timeout=120).stdout
+    except (OSError, subprocess.SubprocessError):
+        return []
+    m = re.search(r"(\d+)\.(\d+)", out or "")
+    if not m or (int(m.group(1)), int(m.group(2))) < (2, 9):
+        print(f"{YELLOW}apktool sin soporte de -j (versión {(out or '?').strip()}); se usa un solo hilo{RESET}")
+        return []
+    return ["-j", str(jobs)]
+
+
+# Códigos que Android sigue resolviendo con su forma ISO antigua (java.util.Locale)
+_LEGACY_LANG_CODES = {"he": "iw", "yi": "ji", "id": "in"}
+
+
+@functools.lru_cache(maxsize=None)
 def lang_to_values_dir(lang_code: str) -> str:
-    """Convierte código BCP-47 básico a directorio values-*
+    """Convierte código BCP-47 a directorio values-*
     - es -> values-es
     - pt-BR -> values-pt-rBR
-    - zh-Hans -> values-zh (simplificado, se recomienda revisar manualmente)
+    - he -> values-iw (códigos antiguos que usa Android)
+    - zh-Hans -> values-b+zh+Hans, sr-Latn-RS -> values-b+sr+Latn+RS, es-419 -> values-b+es+419
     """
     if not lang_code:
         return "values"
-    parts = lang_code.replace('_', '-').split('-')
-    if len(parts) == 1:
-        return f"values-{parts[0]}"
-    # Solo lenguaje y región
-    return f"values-{parts[0]}-r{parts[1].upper()}"
+    parts = [p for p in lang_code.replace('_', '-').split('-') if p]
+    lang = parts[0].lower()
+    lang = _LEGACY_LANG_CODES.get(lang, lang)
+    rest = parts[1:]
+    if not rest:
+        return f"values-{lang}"
+    # Solo lenguaje y región de dos letras
+    if len(rest) == 1 and len(rest[0]) == 2 and rest[0].isalpha():
+        return f"values-{lang}-r{rest[0].upper()}"
+    # Script (Hans, Latn...), región numérica o más subtags: formato b+ de BCP-47
+    subtags = [lang]
+    for p in rest:
+        if len(p) == 4 and p.isalpha():
+            subtags.append(p.title())
+        elif len(p) == 2 and p.isalpha():
+            subtags.append(p.upper())
+        else:
+            subtags.append(p)
+    return "values-b+" + "+".join(subtags)
+
 
+# Líneas finales de salida que se guardan en modo silencioso para mostrarlas si el comando falla
+RUN_TAIL_LINES = 40
 
-def run(cmd, cwd=None, env=None, check=True):
+def run(cmd, cwd=None, env=None, check=True, quiet=False):
     print(f"→ Ejecutando: {' '.join(cmd)}" + (f"  (cwd={cwd})" if cwd else ""))
-    proc = subprocess.run(cmd, cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-    print(proc.stdout)
-    if check and proc.returncode != 0:
+    # La salida se muestra línea a línea mientras corre (apktool puede tardar minutos) sin acumularla;
+    # con quiet solo se conservan las últimas RUN_TAIL_LINES por si hay que mostrarlas tras un fallo
+    tail = collections.deque(maxlen=RUN_TAIL_LINES)
+    with subprocess.Popen(cmd, cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                          text=True, bufsize=1) as p:
+        for line in p.stdout:
+            if quiet:
+                tail.append(line)
+            else:
+                sys.stdout.write(line)
+        returncode = p.wait()
+    if returncode != 0 and tail:
+        sys.stdout.writelines(tail)
+    sys.stdout.flush()
+    if check and returncode != 0:
         raise RuntimeError(f"Fallo comando: {' '.join(cmd)}")
-    return proc
+    return subprocess.CompletedProcess(cmd, returncode)
+
+
+def remove_tree(path: Path):
+    """Borra un árbol de directorios. En POSIX usa `rm -rf` (apktool deja decenas de miles de .smali
+    y shutil.rmtree los borra uno a uno desde Python); si falla o no hay rm, usa shutil.rmtree."""
+    rm = which("rm") if os.name == "posix" else None
+    if rm and subprocess.run([rm, "-rf", "--", str(path)]).returncode == 0:
+        return
+    if path.exists():
+        shutil.rmtree(path)
 
 
 def find_all_locale_strings(decompiled_dir: Path) -> Dict[str, Path]:
@@ -103,7 +168,7 @@ def find_all_locale_strings(decompiled_dir: Path) -> Dict[str, Path]:
     return result
 
 
-def translate_from_all_locales(locale_files: Dict[str, Path], source_lang: str, target_langs: List[str], translator_args: List[str]):
+def translate_from_all_locales(locale_files: Dict[str, Path], source_lang: str, target_langs: List[str]):
     """Para cada locale existente (incluida base), traduce sus strings hacia cada target y fusiona en el destino.
     Escribe directamente en res/values-<target>/strings.xml usando la capacidad de output del traductor.
     """
@@ -112,66 +177,52 @@ def translate_from_all_locales(locale_files: Dict[str, Path], source_lang: str,
     base_file = locale_files[base_locale]
     res_dir = base_file.parent.parent
 
-    for target in target_langs:
-        print(f"{BOLD}{CYAN}==>{RESET} Preparando traducción combinada hacia {YELLOW}{target}{RESET} desde {len(locale_files)} locales…")
+    # Por cada locale origen, traducimos en memoria hacia TODOS los destinos en una sola pasada
+    # (cada petición pide todos los idiomas) y acumulamos resultados; nunca tocamos los archivos de origen
+    print(f"{BOLD}{CYAN}==>{RESET} Preparando traducción combinada hacia {YELLOW}{', '.join(target_langs)}{RESET} desde {len(locale_files)} locales…")
+    total = len(locale_files)
+
+    # La base se parsea una sola vez: el mismo árbol sirve para extraer sus textos y como plantilla
+    # de cada destino (copia en memoria, sin releer el archivo)
+    base_template = axt.load_xml(str(base_file))
+
+    def translate_locale(strings_xml: Path):
+        src_map = axt.extract_strings(str(strings_xml), tree=base_template if strings_xml == base_file else None)
+        return axt.translate_strings_for_languages(src_map, source_lang, target_langs, transliterate=False)
+
+    # Los locales se traducen en paralelo para que sus batches se solapen; el límite global de
+    # peticiones HTTP en vuelo (--max-workers) lo sigue aplicando el traductor
+    per_locale: Dict[str, Dict[str, Dict[str, str]]] = {}
+    workers = max(1, min(axt.HTTP_CONFIG.get("concurrency", 8), total))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        future_to_locale = {executor.submit(translate_locale, sxml): loc for loc, sxml in locale_files.items()}
+        for idx, future in enumerate(concurrent.futures.as_completed(future_to_locale), start=1):
+            src_locale = future_to_locale[future]
+            per_locale[src_locale] = future.result()
+            print(f"{BLUE}[{', '.join(target_langs)}]{RESET} Traducido {idx}/{total} desde locale {src_locale}")
+
+    # Fusionar en el orden original de los locales: las últimas entradas sobrescriben
+    combined_strings: Dict[str, Dict[str, str]] = {target: {} for target in target_langs}
+    for src_locale in locale_files:
+        for target in target_langs:
+            combined_strings[target].update(per_locale[src_locale][target])
+
+    def write_target(target: str):
         target_dir = res_dir / lang_to_values_dir(target)
         target_dir.mkdir(parents=True, exist_ok=True)
         target_file = target_dir / "strings.xml"
 
-        # Inicial: copiar la base como punto de partida
-        shutil.copy2(base_file, target_file)
-
-        # Por cada locale origen, traducimos en memoria y acumulamos resultados; nunca tocamos los archivos de origen
-        total = len(locale_files)
-        combined_strings: Dict[str, str] = {}
-        for idx, (src_locale, strings_xml) in enumerate(locale_files.items(), start=1):
-            src_map = axt.extract_strings(str(strings_xml))
-            translated_map = axt.translate_strings_for_language(src_map, source_lang, target, transliterate=False)
-            combined_strings.update(translated_map)  # las últimas entradas sobrescriben
-            print(f"{BLUE}[{target}]{RESET} Traducido {idx}/{total} desde locale {src_locale}")
-
-        # Escribir todas las claves traducidas sobre el archivo destino (sobrescribe)
-        axt.create_translated_xml(str(target_file), combined_strings, target_lang=target, output_path=str(target_file))
+        # Escribir todas las claves traducidas sobre la base y guardar en el archivo destino (sobrescribe)
+        axt.create_translated_xml(str(base_file), combined_strings[target], target_lang=target,
+                                  output_path=str(target_file), template=base_template)
 
         print(f"{GREEN}✓{RESET} {BOLD}{target}{RESET}: {target_file}")
 
-def merge_android_strings(base_xml_path: str, add_xml_path: str, out_xml_path: str):
-    """Fusiona strings/arrays/plurals de add_xml sobre base_xml (sobreescribe claves existentes y añade faltantes)."""
-    import xml.etree.ElementTree as ET
-    base_tree = ET.parse(base_xml_path)
-    base_root = base_tree.getroot()
-    add_tree = ET.parse(add_xml_path)
-    add_root = add_tree.getroot()
-
-    # Mapas de acceso rápido
-    strings_map = {e.get('name'): e for e in base_root.findall('string')}
-    arrays_map = {e.get('name'): e for e in base_root.findall('string-array')}
-    plurals_map = {e.get('name'): e for e in base_root.findall('plurals')}
-
-    # Strings
-    for e in add_root.findall('string'):
-        name = e.get('name')
-        if name in strings_map:
-            strings_map[name].text = e.text
-        else:
-            base_root.append(e)
-
-    # Arrays
-    for e in add_root.findall('string-array'):
-        name = e.get('name')
-        if name in arrays_map:
-            # reemplazar completo
-            base_root.remove(arrays_map[name])
-        base_root.append(e)
-
-    # Plurals
-    for e in add_root.findall('plurals'):
-        name = e.get('name')
-        if name in plurals_map:
-            base_root.remove(plurals_map[name])
-        base_root.append(e)
-
-    base_tree.write(out_xml_path, encoding='utf-8', xml_declaration=True)
+    # La escritura (disco) va en su propio pool pequeño, separado de la concurrencia HTTP
+    workers = max(1, min(axt.XML_WRITE_WORKERS, len(target_langs)))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in [executor.submit(write_target, target) for target in target_langs]:
+            future.result()
 
 
 def main():
@@ -185,6 +236,7 @@ def main():
     parser.add_argument("--apksigner-path", help="Ruta a apksigner si no está en PATH")
     parser.add_argument("--jarsigner-path", help="Ruta a jarsigner si no está en PATH (fallback)")
     parser.add_argument("--zipalign-path", help="Ruta a zipalign si no está en PATH (opcional)")
+    parser.add_argument("--apktool-jobs", type=int, default=os.cpu_count() or 1, help="Hilos de apktool para decompilar/compilar (-j, apktool >= 2.9; default: núcleos de CPU, 0/1 = sin -j)")
 
     # Firmado
     parser.add_argument("--keystore", help="Ruta al keystore (.jks/.keystore)")
@@ -192,7 +244,7 @@ def main():
     parser.add_argument("--ks-pass", help="Password del keystore (storepass)")
     parser.add_argument("--key-pass", help="Password de la clave (keypass)")
 
-    # Opciones del traductor (se reenvían al script)
+    # Opciones del traductor (se aplican al módulo importado)
     parser.add_argument("--config", help="Ruta al config JSON para Microsoft Translator")
     parser.add_argument("--ms-endpoint", help="Endpoint de Microsoft Translator")
     parser.add_argument("--ms-key", help="Clave de Microsoft Translator")
@@ -200,14 +252,21 @@ def main():
     parser.add_argument("--ms-api-version", help="Versión API (default 3.0)")
     parser.add_argument("--ms-category", help="Categoría personalizada (opcional)")
     parser.add_argument("--ms-text-type", choices=["plain", "html"], help="Tipo de texto (plain/html)")
-    parser.add_argument("--max-workers", type=int, help="Trabajadores paralelos del traductor (por idioma)")
+    parser.add_argument("--max-workers", type=int, help="Máximo de peticiones simultáneas del traductor (todos los idiomas)")
     parser.add_argument("--http-timeout", type=float, help="Timeout HTTP del traductor")
     parser.add_argument("--http-pool-maxsize", type=int, help="Pool de conexiones HTTP")
     parser.add_argument("--http-retries", type=int, help="Reintentos HTTP del traductor")
+    parser.add_argument("--http-concurrency", type=int, help="Batches en paralelo por pasada de traducción (cada petición lleva todos los idiomas) y locales de origen traducidos a la vez (límite global: --max-workers)")
+    parser.add_argument("--chars-per-minute", type=int, help="Caracteres por minuto enviados al traductor según la cuota (0 = sin límite)")
+    parser.add_argument("--ms-batch-size", type=int, help="Segmentos de texto por petición al traductor (default 100)")
+    parser.add_argument("--cache-file", default=os.getenv("ANDROID_XML_TRANSLATOR_CACHE", axt.DEFAULT_CACHE_FILE), help="Archivo SQLite de la caché persistente de traducciones")
+    parser.add_argument("--cache-ttl-days", type=float, default=float(os.getenv("ANDROID_XML_TRANSLATOR_CACHE_TTL_DAYS", axt.DEFAULT_CACHE_TTL_DAYS)), help="Días de validez de la caché (0 = sin caducidad)")
+    parser.add_argument("--no-cache", action="store_true", help="No reutilizar traducciones en caché (las nuevas sí se guardan)")
 
     # Directorios/archivos de salida
     parser.add_argument("--workdir", help="Directorio de trabajo (se creará si no existe)")
     parser.add_argument("--out", help="Ruta del APK firmado de salida (default: <apk>_signed.apk)")
+    parser.add_argument("--quiet", action="store_true", help="No mostrar la salida de apktool/zipalign/firma salvo si fallan")
 
     args = parser.parse_args()
     # Configurar Microsoft Translator en el módulo importado (axt) usando precedencia defaults < file < env < CLI
@@ -239,6 +298,9 @@ def main():
                         "timeout": loaded.get("http_timeout"),
                         "pool_maxsize": loaded.get("http_pool_maxsize"),
                         "retries": loaded.get("http_retries"),
+                        "concurrency": loaded.get("http_concurrency"),
+                        "batch_size": loaded.get("batch_size"),
+                        "chars_per_minute": loaded.get("chars_per_minute"),
                     }
         except Exception as e:
             print(f"Warning: No se pudo leer el archivo de configuración: {e}")
@@ -280,7 +342,7 @@ def main():
                 if k == "timeout":
                     try: base[k] = float(v)
                     except Exception: pass
-                elif k in ("pool_maxsize", "retries"):
+                elif k in ("pool_maxsize", "retries", "concurrency", "batch_size", "chars_per_minute"):
                     try: base[k] = int(v)
                     except Exception: pass
                 else:
@@ -292,11 +354,18 @@ def main():
         "timeout": args.http_timeout,
         "pool_maxsize": args.http_pool_maxsize,
         "retries": args.http_retries,
+        "concurrency": args.http_concurrency,
+        "batch_size": args.ms_batch_size,
+        "chars_per_minute": args.chars_per_minute,
     })
+    if args.max_workers is not None:
+        axt.HTTP_CONFIG["max_in_flight"] = args.max_workers
 
     if not axt.MS_TRANSLATOR_CONFIG.get("key"):
         print("Error: Debes proporcionar la clave de Microsoft Translator con --ms-key, AZURE_TRANSLATOR_KEY o en el config.")
         sys.exit(1)
+    axt.freeze_config()
+    axt.open_disk_cache(args.cache_file, ttl_days=args.cache_ttl_days, read=not args.no_cache)
 
 
     apk_path = Path(args.apk).resolve()
@@ -329,44 +398,27 @@ def main():
 
     decompiled_dir = workdir / "apk_src"
     if decompiled_dir.exists():
-        shutil.rmtree(decompiled_dir)
+        remove_tree(decompiled_dir)
 
     # 1) Decompilar
-    run([apktool, "d", str(apk_path), "-o", str(decompiled_dir), "-f"])  # -f para forzar overwrite
+    jobs_args = apktool_jobs_args(apktool, args.apktool_jobs)
+    run([apktool, "d", *jobs_args, str(apk_path), "-o", str(decompiled_dir), "-f"], quiet=args.quiet)  # -f para forzar overwrite
 
     # 2) Traducir res/values/strings.xml
     locale_files = find_all_locale_strings(decompiled_dir)
     print(f"Locales encontradas: {', '.join(sorted(locale_files.keys()))}")
 
-    # Construir args a reenviar al traductor
-    forward_args = []
-    for opt in [
-        ("--config", args.config),
-        ("--ms-endpoint", args.ms_endpoint),
-        ("--ms-key", args.ms_key),
-        ("--ms-region", args.ms_region),
-        ("--ms-api-version", args.ms_api_version),
-        ("--ms-category", args.ms_category),
-        ("--ms-text-type", args.ms_text_type),
-        ("--max-workers", str(args.max_workers) if args.max_workers is not None else None),
-        ("--http-timeout", str(args.http_timeout) if args.http_timeout is not None else None),
-        ("--http-pool-maxsize", str(args.http_pool_maxsize) if args.http_pool_maxsize is not None else None),
-        ("--http-retries", str(args.http_retries) if args.http_retries is not None else None),
-    ]:
-        if opt[1]:
-            forward_args.extend([opt[0], opt[1]])
-
-    translate_from_all_locales(locale_files, args.source_lang, args.target_langs, forward_args)
+    translate_from_all_locales(locale_files, args.source_lang, args.target_langs)
 
     # 3) Recompilar
     unsigned_apk = workdir / "unsigned.apk"
-    run([apktool, "b", str(decompiled_dir), "-o", str(unsigned_apk)])
+    run([apktool, "b", *jobs_args, str(decompiled_dir), "-o", str(unsigned_apk)], quiet=args.quiet)
 
     # 4) Zipalign (opcional pero recomendado antes de firmar)
     aligned_apk = unsigned_apk
     if zipalign:
         aligned_apk = workdir / "aligned.apk"
-        run([zipalign, "-f", "-p", "4", str(unsigned_apk), str(aligned_apk)])
+        run([zipalign, "-f", "-p", "4", str(unsigned_apk), str(aligned_apk)], quiet=args.quiet)
 
     # 5) Firmar (si se proporcionó keystore)
     final_apk = Path(args.out).resolve() if args.out else apk_path.with_name(apk_path.stem + "_signed.apk")
@@ -383,7 +435,7 @@ def main():
             if args.key_pass:
                 cmd.extend(["--key-pass", f"pass:{args.key_pass}"])
             cmd.append(str(aligned_apk))
-            run(cmd)
+            run(cmd, quiet=args.quiet)
         else:
             # jarsigner firma in-place; luego renombramos
             cmd = [
@@ -396,7 +448,7 @@ def main():
             if args.key_pass:
                 cmd.extend(["-keypass", args.key_pass])
             cmd.extend([str(aligned_apk), args.ks_alias])
-            run(cmd)
+            run(cmd, quiet=args.quiet)
         print(f"APK firmado: {final_apk}")
     else:
         # Si no se firma, dejamos el APK (posiblemente aligned) como salida